@@ -2,6 +2,7 @@ from __future__ import absolute_import, division, print_function
 
 import inspect
 
+import numpy as np
 import tensorflow as tf
 from tensorflow.python import keras
 from tensorflow.python.keras import Model
@@ -12,7 +13,7 @@ from tensorflow_probability.python.layers import DistributionLambda
 
 __all__ = [
     'copy_keras_metadata', 'has_keras_meta', 'add_trainable_weights',
-    'layer2text'
+    'layer2text', 'fold_batchnorm'
 ]
 
 
@@ -128,3 +129,84 @@ def layer2text(layer, inc_name=False, padding=''):
   if hasattr(layer, 'input_shape') and hasattr(layer, 'output_shape'):
     text += ' %s->%s' % (str(layer.input_shape), str(layer.output_shape))
   return text
+
+
+# ===========================================================================
+# Inference graph optimization
+# ===========================================================================
+_UNFOLDABLE_CONV = (keras.layers.Conv2DTranspose, keras.layers.Conv3DTranspose,
+                    keras.layers.SeparableConv1D, keras.layers.SeparableConv2D,
+                    keras.layers.DepthwiseConv2D)
+
+
+def _can_fold_batchnorm(layer, bn):
+  if not isinstance(bn, keras.layers.BatchNormalization) or \
+    not isinstance(layer, (Conv, keras.layers.Dense)) or \
+      isinstance(layer, _UNFOLDABLE_CONV):
+    return False
+  if not (layer.built and bn.built):
+    return False
+  # only linear projection followed by the batch normalization over the
+  # last (i.e. channel) axis could be folded
+  if layer.activation is not keras.activations.linear:
+    return False
+  if isinstance(layer, Conv) and layer.data_format != 'channels_last':
+    return False
+  # NOTE: `output_shape` is not available for layers only called eagerly
+  ndim = bn.input_spec.ndim
+  if ndim is None:
+    return False
+  return [i % ndim for i in tf.nest.flatten(bn.axis)] == [ndim - 1]
+
+
+def _fold_batchnorm(layer, bn):
+  kernel = keras.backend.get_value(layer.kernel)
+  bias = keras.backend.get_value(layer.bias) if layer.use_bias else 0.
+  mean = keras.backend.get_value(bn.moving_mean)
+  variance = keras.backend.get_value(bn.moving_variance)
+  gamma = keras.backend.get_value(bn.gamma) if bn.scale else 1.
+  beta = keras.backend.get_value(bn.beta) if bn.center else 0.
+  factor = gamma / np.sqrt(variance + bn.epsilon)
+  config = layer.get_config()
+  config['use_bias'] = True
+  config['name'] = layer.name + '_bnfolded'
+  new_layer = layer.__class__.from_config(config)
+  # rank of the input equals rank of the output (i.e. the BatchNorm input)
+  new_layer.build([None] * (bn.input_spec.ndim - 1) + [kernel.shape[-2]])
+  new_layer.set_weights([
+      (kernel * factor).astype(kernel.dtype),
+      (beta + (bias - mean) * factor).astype(kernel.dtype)
+  ])
+  return new_layer
+
+
+def fold_batchnorm(model):
+  r""" Create a new `keras.Sequential` for inference, in which every
+  `BatchNormalization` directly following a linear `Conv` or `Dense` layer
+  is folded into the kernel and bias of that layer.
+
+  At inference, batch normalization is a per-channel affine transform, hence:
+    `W' = W * gamma / sqrt(var + eps)`
+    `b' = beta + (b - mean) * gamma / sqrt(var + eps)`
+
+  Arguments:
+    model : a built `keras.Sequential`
+
+  Return:
+    a new `keras.Sequential`, all other layers are shared with the given model
+  """
+  assert isinstance(model, keras.Sequential), \
+    "Only support keras.Sequential, but given: %s" % str(type(model))
+  assert model.built, "The model must be built before folding BatchNorm"
+  layers = list(model.layers)
+  new_layers = []
+  i = 0
+  while i < len(layers):
+    layer = layers[i]
+    if i + 1 < len(layers) and _can_fold_batchnorm(layer, layers[i + 1]):
+      new_layers.append(_fold_batchnorm(layer, layers[i + 1]))
+      i += 2
+    else:
+      new_layers.append(layer)
+      i += 1
+  return keras.Sequential(new_layers, name=model.name + '_bnfolded')
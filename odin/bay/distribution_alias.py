@@ -115,11 +115,12 @@ def parse_distribution(alias):
   """
   if isinstance(alias, string_types):
     alias = alias.lower()
-    if alias not in _dist_mapping:
+    res = _dist_mapping.get(alias, None)
+    if res is None:
       raise ValueError("Cannot find distribution with alias: '%s', "
                        "all available distributions: %s" %
                        (alias, ', '.join(list(_dist_mapping.keys()))))
-    layer, dist = _dist_mapping[alias]
+    layer, dist = res
     return layer, dist
   if not inspect.isclass(alias):
     alias = type(alias)
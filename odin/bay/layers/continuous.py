@@ -532,6 +532,7 @@ class MultivariateNormalLayer(DistributionLambda):
             t, event_shape, covariance, parse_activation(loc_activation, self),
             parse_activation(scale_activation, self), validate_args),
         convert_to_tensor_fn, **kwargs)
+    self.params_size_kwargs = dict(covariance=covariance)
 
   @staticmethod
   def new(params,
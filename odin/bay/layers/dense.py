@@ -1,7 +1,7 @@
 from __future__ import absolute_import, division, print_function
 
 import inspect
-from functools import partial
+from functools import lru_cache, partial
 from numbers import Number
 from typing import Callable, Optional, Text, Type, Union
 
@@ -28,8 +28,9 @@ from tensorflow_probability.python.layers.distribution_layer import (
 
 from odin import backend as bk
 from odin.bay.distribution_alias import parse_distribution
-from odin.bay.helpers import (KLdivergence, is_binary_distribution,
-                              is_discrete_distribution, is_mixture_distribution,
+from odin.bay.helpers import (KLdivergence, coercible_tensor,
+                              is_binary_distribution, is_discrete_distribution,
+                              is_mixture_distribution,
                               is_zeroinflated_distribution, kl_divergence)
 from odin.bay.layers.continuous import VectorDeterministicLayer
 from odin.bay.layers.distribution_util_layers import Moments, Sampling
@@ -40,23 +41,73 @@ __all__ = [
 ]
 
 
-def _params_size(layer, event_shape):
-  spec = inspect.getfullargspec(layer.params_size)
+@lru_cache(maxsize=None)
+def _params_size_spec(params_size_fn, is_bound, distribution_code):
+  r""" Return `(uses_event_size, closure_kw_names)`, the reflection only
+  depends on the layer class so it is done once and cached """
+  spec = inspect.getfullargspec(params_size_fn)
   args = spec.args + spec.kwonlyargs
-  if 'event_size' == args[0]:
+  if is_bound:
+    args = args[1:]
+  uses_event_size = ('event_size' == args[0])
+  freevars = () if distribution_code is None else \
+    distribution_code.co_freevars
+  closure_kw_names = tuple(k for k in args[1:] if k in freevars)
+  return uses_event_size, closure_kw_names
+
+
+def _params_size(layer, event_shape):
+  params_size = layer.params_size
+  has_kwargs = hasattr(layer, 'params_size_kwargs')
+  fn = layer._make_distribution_fn
+  # the cache is keyed on the underlying function, so bound methods do not
+  # keep their instances alive
+  uses_event_size, closure_kw_names = _params_size_spec(
+      getattr(params_size, '__func__', params_size),
+      hasattr(params_size, '__self__'),
+      None if has_kwargs else getattr(fn, '__code__', None))
+  if uses_event_size:
     event_shape = tf.reduce_prod(event_shape)
-  # extra kwargs from function closure
+  if has_kwargs:
+    return params_size(event_shape, **layer.params_size_kwargs)
+  # fallback for third-party layers, extra kwargs from function closure
   kw = {}
-  if len(args) > 1:
-    fn = layer._make_distribution_fn
+  if len(closure_kw_names) > 0:
     closures = {
         k: v.cell_contents
         for k, v in zip(fn.__code__.co_freevars, fn.__closure__)
     }
-    for k in args[1:]:
-      if k in closures:
-        kw[k] = closures[k]
-  return layer.params_size(event_shape, **kw)
+    kw = {k: closures[k] for k in closure_kw_names}
+  return params_size(event_shape, **kw)
+
+
+def _is_number(x):
+  return isinstance(x, Number) or (isinstance(x, np.ndarray) and x.ndim == 0)
+
+
+def _fill_param(x, shape, dtype):
+  r""" Broadcast a scalar parameter to given shape, numeric scalars are
+  broadcasted in numpy with the final dtype to create a single constant """
+  if _is_number(x):
+    return tf.constant(np.full(shape, x, dtype=dtype))
+  if tf.rank(x) == 0:
+    return tf.fill(shape, tf.cast(x, dtype))
+  return tf.cast(x, dtype)
+
+
+def _prior_arrays(loc, log_scale, mixture_logits, n_components, event_size,
+                  scale_size):
+  r""" Broadcast the scalar parameters of the mixture prior """
+  return (np.full((n_components, event_size), loc),
+          np.full((n_components, scale_size), log_scale),
+          np.full(n_components, mixture_logits))
+
+
+try:
+  from numba import njit
+  _prior_arrays = njit(_prior_arrays, cache=True)
+except ImportError:
+  pass
 
 
 class DenseDistribution(Dense):
@@ -78,6 +129,8 @@ class DenseDistribution(Dense):
   Return:
     `tensorflow_probability.Distribution`
   """
+  _REPR_TMPL = ("<Dense proj:{} shape:{} #params:{:d} posterior:{} prior:{} "
+                "dropout:{:.2f} kw:{}>")
 
   def __init__(self,
                event_shape=(),
@@ -119,6 +172,12 @@ class DenseDistribution(Dense):
     self._prior = prior
     self._event_shape = event_shape
     self._posterior_class = post_layer_cls
+    self._posterior_name = post_layer_cls.__name__.replace(
+        "tfp.distributions.", "")
+    # deterministic posterior is created directly from the params, bypassing
+    # the `DistributionLambda`
+    self._is_deterministic = issubclass(post_layer_cls,
+                                        VectorDeterministicLayer)
     self._posterior_kwargs = posterior_kwargs
     self._dropout = dropout
     # set more descriptive name
@@ -128,7 +187,8 @@ class DenseDistribution(Dense):
                            posterior.__class__.__name__)
     kwargs['name'] = name
     # params_size could be static function or method
-    params_size = _params_size(self.posterior_layer(), event_shape)
+    default_posterior = self.posterior_layer()
+    params_size = _params_size(default_posterior, event_shape)
     self._disable_projection = bool(disable_projection)
     super(DenseDistribution,
           self).__init__(units=params_size,
@@ -144,6 +204,8 @@ class DenseDistribution(Dense):
                          **kwargs)
     # store the distribution from last call
     self._last_distribution = None
+    # the posterior layer for default `sample_shape` is reused for every call
+    self._default_posterior_layer = default_posterior
     # if 'input_shape' in kwargs and not self.built:
     #   self.build(kwargs['input_shape'])
 
@@ -189,14 +251,16 @@ class DenseDistribution(Dense):
     assert isinstance(p, (Distribution, type(None)))
     self._prior = p
 
-  def posterior_layer(self, sample_shape=()) -> DistributionLambda:
+  def _get_convert_fn(self, sample_shape=()):
     if self._convert_to_tensor_fn == Distribution.sample:
-      fn = partial(Distribution.sample, sample_shape=sample_shape)
-    else:
-      fn = self._convert_to_tensor_fn
-    return self._posterior_class(self._event_shape,
-                                 convert_to_tensor_fn=fn,
-                                 **self._posterior_kwargs)
+      return partial(Distribution.sample, sample_shape=sample_shape)
+    return self._convert_to_tensor_fn
+
+  def posterior_layer(self, sample_shape=()) -> DistributionLambda:
+    return self._posterior_class(
+        self._event_shape,
+        convert_to_tensor_fn=self._get_convert_fn(sample_shape),
+        **self._posterior_kwargs)
 
   @property
   def posterior(self) -> Distribution:
@@ -212,25 +276,55 @@ class DenseDistribution(Dense):
                          self.__class__.__name__)
     return self.prior.sample(sample_shape=sample_shape, seed=seed)
 
-  def call(self,
-           inputs,
-           training=None,
-           sample_shape=(),
-           projection=True,
-           prior=None):
+  @tf.function(experimental_compile=True, experimental_relax_shapes=True)
+  def _compute_params(self, inputs, training=None, projection=True):
+    r""" The numeric part of `call` (i.e. projection and dropout) is XLA
+    compiled, so the matmul and the dropout mask are fused, the
+    `DistributionLambda` is applied outside """
     # projection by Dense layer could be skipped by setting projection=False
     # NOTE: a 2D inputs is important here, but we don't want to flatten
     # automatically
     if projection and not self._disable_projection:
-      params = super().call(inputs)
+      params = super(DenseDistribution, self).call(inputs)
     else:
       params = inputs
-    # applying dropout
+    # applying dropout, for 2D params a single mask is shared across the
+    # minibatch (i.e. batchwise dropout), otherwise, the mask is elementwise
+    # and its shape must be dynamic since the batch dimensions are relaxed
     if self._dropout > 0:
-      params = bk.dropout(params, p_drop=self._dropout, training=training)
-    # create posterior distribution (this will create a new layer everytime)
-    posterior = self.posterior_layer(sample_shape=sample_shape)(
-        params, training=training)
+      if params.shape.ndims == 2:
+        params = bk.dropout(params,
+                            p_drop=self._dropout,
+                            axis=0,
+                            training=training)
+      elif training:
+        params = tf.nn.dropout(params, rate=self._dropout)
+    return params
+
+  def call(self,
+           inputs,
+           training=None,
+           sample_shape=(),
+           projection=True,
+           prior=None):
+    params = self._compute_params(inputs,
+                                  training=training,
+                                  projection=projection)
+    is_default_shape = sample_shape is None or \
+      (isinstance(sample_shape, (tuple, list)) and len(sample_shape) == 0)
+    # create posterior distribution, only create a new layer for non-default
+    # `sample_shape`
+    if self._is_deterministic:
+      posterior = coercible_tensor(
+          self._posterior_class.new(params, self._event_shape,
+                                    **self._posterior_kwargs),
+          convert_to_tensor_fn=self._get_convert_fn(
+              () if is_default_shape else sample_shape))
+    elif is_default_shape:
+      posterior = self._default_posterior_layer(params, training=training)
+    else:
+      posterior = self.posterior_layer(sample_shape=sample_shape)(
+          params, training=training)
     self._last_distribution = posterior
     # NOTE: all distribution has the method kl_divergence, so we cannot use it
     prior = self.prior if prior is None else prior
@@ -259,7 +353,10 @@ class DenseDistribution(Dense):
         number of MCMC sample if `analytic=False`
 
     Return:
-      kullback_divergence : Tensor [sample_shape, batch_size, ...]
+      kullback_divergence : Tensor [sample_shape, batch_size, ...], for
+        `analytic=True` the sample dimension is kept as `1` (i.e. the
+        divergence is the same for every sample) and broadcasts against
+        `sample_shape`
     """
     if prior is None:
       prior = self._prior
@@ -276,10 +373,8 @@ class DenseDistribution(Dense):
                                  q_sample=sample_shape,
                                  auto_remove_independent=True)
     if analytic:
+      # no copy for each sample, the consumer broadcasts when needed
       kullback_div = tf.expand_dims(kullback_div, axis=0)
-      if isinstance(sample_shape, Number) and sample_shape > 1:
-        ndims = kullback_div.shape.ndims
-        kullback_div = tf.tile(kullback_div, [sample_shape] + [1] * (ndims - 1))
     return kullback_div
 
   def log_prob(self, x):
@@ -291,12 +386,11 @@ class DenseDistribution(Dense):
     return self.__str__()
 
   def __str__(self):
-    text = "<Dense proj:%s shape:%s #params:%d posterior:%s prior:%s dropout:%.2f kw:%s>" % \
-      (not self._disable_projection, self.event_shape, self.units,
-       self._posterior_class.__name__, str(self.prior),
-       self._dropout, str(self._posterior_kwargs))
-    text = text.replace("tfp.distributions.", "")
-    return text
+    return DenseDistribution._REPR_TMPL.format(
+        not self._disable_projection, self.event_shape, self.units,
+        self._posterior_name,
+        str(self.prior).replace("tfp.distributions.", ""), self._dropout,
+        str(self._posterior_kwargs))
 
   def get_config(self):
     config = super().get_config()
@@ -362,7 +456,8 @@ class MixtureDensityNetwork(DenseDistribution):
       `[n_components, event_size*(event_size +1)//2]` for 'full' component.
     mixture_logits : Scalar or Tensor with shape `[n_components]`
     """
-    event_size = self.event_size
+    event_size = int(np.prod(self.event_shape))
+    dtype = np.dtype(self.dtype)
     if self.covariance == 'diag':
       scale_shape = [self.n_components, event_size]
       fn = lambda l, s: MultivariateNormalDiag(loc=l,
@@ -375,20 +470,20 @@ class MixtureDensityNetwork(DenseDistribution):
       fn = lambda l, s: MultivariateNormalTriL(
           loc=l, scale_tril=FillScaleTriL(diag_shift=1e-5)(tf.math.softplus(s)))
     #
-    if isinstance(log_scale, Number) or tf.rank(log_scale) == 0:
-      loc = tf.fill([self.n_components, self.event_size], loc)
-    #
-    if isinstance(log_scale, Number) or tf.rank(log_scale) == 0:
-      log_scale = tf.fill(scale_shape, log_scale)
-    #
     if mixture_logits is None:
       mixture_logits = 1.
-    if isinstance(mixture_logits, Number) or tf.rank(mixture_logits) == 0:
-      mixture_logits = tf.fill([self.n_components], mixture_logits)
-    #
-    loc = tf.cast(loc, self.dtype)
-    log_scale = tf.cast(log_scale, self.dtype)
-    mixture_logits = tf.cast(mixture_logits, self.dtype)
+    if _is_number(loc) and _is_number(log_scale) and \
+      _is_number(mixture_logits):
+      loc, log_scale, mixture_logits = [
+          tf.constant(x, dtype=dtype)
+          for x in _prior_arrays(float(loc), float(log_scale),
+                                 float(mixture_logits), int(self.n_components),
+                                 event_size, scale_shape[1])
+      ]
+    else:
+      loc = _fill_param(loc, [self.n_components, event_size], dtype)
+      log_scale = _fill_param(log_scale, scale_shape, dtype)
+      mixture_logits = _fill_param(mixture_logits, [self.n_components], dtype)
     self._prior = MixtureSameFamily(
         components_distribution=fn(loc, log_scale),
         mixture_distribution=Categorical(logits=mixture_logits),
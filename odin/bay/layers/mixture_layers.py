@@ -79,6 +79,8 @@ class MixtureGaussianLayer(tfp.layers.DistributionLambda):
     self.event_shape = event_shape
     self.n_components = n_components
     self.covariance = str(covariance).strip().lower()
+    self.params_size_kwargs = dict(n_components=n_components,
+                                   covariance=self.covariance)
 
   @staticmethod
   def new(params,
@@ -250,6 +252,8 @@ class MixtureNegativeBinomialLayer(tfp.layers.DistributionLambda):
     self.event_shape = event_shape
     self.n_components = n_components
     self.zero_inflated = zero_inflated
+    self.params_size_kwargs = dict(n_components=n_components,
+                                   zero_inflated=zero_inflated)
 
   @staticmethod
   def new(
@@ -318,7 +322,8 @@ class MixtureNegativeBinomialLayer(tfp.layers.DistributionLambda):
                                                validate_args=False,
                                                name='Mixture%s' % name)
 
-  def params_size(self):
+  @staticmethod
+  def params_size(event_shape=(), n_components=2, zero_inflated=False):
     r"""Number of `params` needed to create a `MixtureNegativeBinomialLayer`
     distribution.
 
@@ -326,11 +331,11 @@ class MixtureNegativeBinomialLayer(tfp.layers.DistributionLambda):
      params_size: The number of parameters needed to create the mixture
        distribution.
     """
-    n_components = tf.convert_to_tensor(value=self.n_components,
+    n_components = tf.convert_to_tensor(value=n_components,
                                         name='n_components',
                                         dtype_hint=tf.int32)
-    params_size = tf.convert_to_tensor(value=tf.reduce_prod(self.event_shape) *
-                                       (3 if self.zero_inflated else 2),
+    params_size = tf.convert_to_tensor(value=tf.reduce_prod(event_shape) *
+                                       (3 if zero_inflated else 2),
                                        name='params_size')
     n_components = dist_util.prefer_static_value(n_components)
     params_size = dist_util.prefer_static_value(params_size)
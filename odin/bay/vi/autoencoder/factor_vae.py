@@ -6,18 +6,16 @@ from tensorflow.python import keras
 
 from odin.bay.vi.autoencoder.beta_vae import BetaVAE
 from odin.bay.vi.autoencoder.networks import FactorDiscriminator
-from odin.bay.vi.autoencoder.variational_autoencoder import TrainStep
+from odin.bay.vi.autoencoder.variational_autoencoder import (TrainStep,
+                                                            _to_optimizer)
 
 
 class FactorStep(TrainStep):
 
   def __call__(self):
-    inputs, qZ_X = self.inputs
-    qZ_Xprime = self.vae.encode(inputs,
-                                training=self.training,
-                                mask=self.mask,
-                                sample_shape=self.sample_shape)
-    dtc_loss = self.vae.dtc_loss(qZ_X, qZ_Xprime, training=training)
+    # the inputs are the latents of the VAE step, the permuted codes are
+    # taken from their samples, hence, no second pass through the encoder
+    dtc_loss = self.vae.dtc_loss(self.inputs, training=self.training)
     return dtc_loss, dict(dtc=dtc_loss)
 
 
@@ -58,10 +56,10 @@ class FactorVAE(BetaVAE):
                beta=1.0,
                **kwargs):
     super().__init__(beta=beta, **kwargs)
-    self.gamma = tf.convert_to_tensor(gamma, dtype=self.dtype, name='gamma')
+    self.gamma = gamma
     # all latents will be concatenated
-    latent_dim = np.prod(
-        sum(np.array(layer.event_shape) for layer in self.latent_layers))
+    latent_dim = int(
+        sum(int(np.prod(layer.event_shape)) for layer in self.latent_layers))
     # init discriminator
     if not isinstance(discriminator, keras.layers.Layer):
       discriminator = FactorDiscriminator(input_shape=(latent_dim,),
@@ -69,11 +67,21 @@ class FactorVAE(BetaVAE):
     self.discriminator = discriminator
     # VAE and discriminator must be trained separated so we split
     # their params here
-    self.disc_params = self.discriminator.trainable_variables
+    self.disc_params = tuple(self.discriminator.trainable_variables)
     exclude = set(id(p) for p in self.disc_params)
-    self.vae_params = [
-        p for p in self.trainable_variables if id(p) not in exclude
-    ]
+    self.vae_params = tuple(
+        p for p in self.trainable_variables if id(p) not in exclude)
+    # the distribution strategy used while fitting
+    self._strategy = None
+
+  @property
+  def gamma(self) -> float:
+    return self._gamma
+
+  @gamma.setter
+  def gamma(self, gamma):
+    # kept as python float, so it is promoted inline by tensorflow
+    self._gamma = float(gamma)
 
   def _elbo(self, X, pX_Z, qZ_X, analytic, reverse, sample_shape, mask,
             training):
@@ -87,7 +95,7 @@ class FactorVAE(BetaVAE):
     """
     tc = self.discriminator.total_correlation(qZ_X, training=training)
     if scaled_by_gamma:
-      tc = self.gamma * tc
+      tc = tc * self.gamma
     return tc
 
   def dtc_loss(self, qZ_X, qZ_Xprime=None, training=None):
@@ -123,16 +131,9 @@ class FactorVAE(BetaVAE):
     ```
     """
     self.step.assign_add(1.)
-    # split inputs into 2 mini-batches here
-    if tf.is_tensor(inputs):
-      x1, x2 = tf.split(inputs, 2, axis=0)
-    else:
-      inputs = [tf.split(x, 2, axis=0) for x in tf.nest.flatten(inputs)]
-      x1 = [i[0] for i in inputs]
-      x2 = [i[1] for i in inputs]
     # first step optimize VAE with total correlation loss
     step1 = TrainStep(vae=self,
-                      inputs=x1,
+                      inputs=inputs,
                       training=training,
                       mask=mask,
                       sample_shape=sample_shape,
@@ -142,13 +143,32 @@ class FactorVAE(BetaVAE):
     yield step1
     # second step optimize the discriminator for discriminate permuted code
     step2 = FactorStep(vae=self,
-                       inputs=[x2, step1.qZ_X],
+                       inputs=step1.qZ_X,
                        training=training,
                        mask=mask,
                        sample_shape=sample_shape,
                        parameters=self.disc_params)
     yield step2
 
+  def optimize(self, inputs, training=True, mask=None, optimizer=None):
+    # only the training batches are distributed, validation runs on the
+    # whole batch in the cross-replica context
+    if self._strategy is None or not training:
+      return super().optimize(inputs,
+                              training=training,
+                              mask=mask,
+                              optimizer=optimizer)
+    # each replica runs both the VAE and the discriminator steps on its own
+    # shard
+    strategy = self._strategy
+    loss, metrics = strategy.experimental_run_v2(
+        super(FactorVAE, self).optimize,
+        args=(inputs,),
+        kwargs=dict(training=training, mask=mask, optimizer=optimizer))
+    reduce = lambda x: strategy.reduce(
+        tf.distribute.ReduceOp.MEAN, x, axis=None)
+    return reduce(loss), {k: reduce(v) for k, v in metrics.items()}
+
   def fit(
       self,
       train: tf.data.Dataset,
@@ -171,11 +191,34 @@ class FactorVAE(BetaVAE):
       autograph=False,
       logging_interval=2,
       log_tag='',
-      log_path=None):
+      log_path=None,
+      strategy: Optional[tf.distribute.Strategy] = None):
+    r""" Fitting the VAE and the discriminator
+
+    Arguments:
+      strategy : `tf.distribute.Strategy` (e.g. `MirroredStrategy`) for
+        synchronous data parallel training of both the VAE and the
+        discriminator steps. The model must be created under
+        `strategy.scope()`. The `valid` dataset is not distributed.
+    """
     kw = dict(locals())
     del kw['self']
     del kw['__class__']
-    super().fit(**kw)
+    del kw['strategy']
+    if strategy is not None:
+      # the distributed dataset cannot be repeated
+      if hasattr(train, 'repeat'):
+        train = train.repeat(int(epochs))
+      kw['train'] = strategy.experimental_distribute_dataset(train)
+      with strategy.scope():
+        if optimizer is not None and self.optimizer is None:
+          self.optimizer = _to_optimizer(optimizer, learning_rate, clipnorm)
+    self._strategy = strategy
+    try:
+      super().fit(**kw)
+    finally:
+      self._strategy = None
+    return self
 
   def __str__(self):
     text = super().__str__()
@@ -310,10 +310,12 @@ class VariationalAutoencoder(keras.Model):
         x = tf.ones(shape=shape, dtype=layer.dtype)
         layer(x)  # call this dummy input to build the layer
     ### the training step
-    self.step = tf.Variable(step,
-                            dtype=self.dtype,
-                            trainable=False,
-                            name="Step")
+    self.step = tf.Variable(
+        step,
+        dtype=self.dtype,
+        trainable=False,
+        aggregation=tf.VariableAggregation.ONLY_FIRST_REPLICA,
+        name="Step")
     self._trainstep_kw = dict()
     self.trainer = None
     self.latent_names = [i.name for i in self.latent_layers]
@@ -662,6 +664,9 @@ class VariationalAutoencoder(keras.Model):
     total_loss = 0.
     optimizer = tf.nest.flatten(optimizer)
     n_optimizer = len(optimizer)
+    # the gradients are summed across replicas in distributed training
+    replica_ctx = tf.distribute.get_replica_context()
+    n_replicas = 1 if replica_ctx is None else replica_ctx.num_replicas_in_sync
     for i, step in enumerate(
         self.train_steps(inputs=inputs,
                          training=training,
@@ -674,8 +679,9 @@ class VariationalAutoencoder(keras.Model):
         with tf.GradientTape(watch_accessed_variables=False) as tape:
           tape.watch(parameters)
           loss, metrics = step()
+          scaled_loss = loss / n_replicas if n_replicas > 1 else loss
         # applying the gradients
-        gradients = tape.gradient(loss, parameters)
+        gradients = tape.gradient(scaled_loss, parameters)
         opt.apply_gradients(zip(gradients, parameters))
       else:
         tape = None
@@ -10,6 +10,7 @@ import numpy as np
 import tensorflow as tf
 from tensorflow.python import keras
 from tensorflow.python.data.ops.iterator_ops import OwnedIterator
+from tensorflow.python.distribute.input_lib import DistributedDataset
 from tensorflow.python.eager.def_function import Function
 
 from odin.utils import as_tuple
@@ -416,7 +417,8 @@ class Trainer(object):
     r""" A simplified fitting API
 
     Arugments:
-      train_ds : tf.data.Dataset. Training dataset.
+      train_ds : tf.data.Dataset. Training dataset, could be distributed by
+        `tf.distribute.Strategy.experimental_distribute_dataset`.
       optimize : Callable. Optimization function, return loss and a list of
         metrics. The input arguments must be:
           - ('inputs', 'tape', 'training', 'n_iter');
@@ -446,7 +448,8 @@ class Trainer(object):
     if len(log_tag) > 0:
       log_tag += " "
     ### Prepare the data
-    assert isinstance(train_ds, (tf.data.Dataset, OwnedIterator)), \
+    assert isinstance(train_ds,
+                      (tf.data.Dataset, OwnedIterator, DistributedDataset)), \
       'train_ds must be instance of tf.data.Datasets'
     if valid_ds is not None:
       assert isinstance(valid_ds, (tf.data.Dataset, OwnedIterator)), \
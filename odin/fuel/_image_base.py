@@ -9,19 +9,47 @@ from odin.utils.net_utils import download_and_extract
 # ===========================================================================
 # Helpers
 # ===========================================================================
+_tfds = None
+
+
+def _get_tfds():
+  r""" Import `tensorflow_datasets` on first use only, it is a heavy import
+  and not required for the datasets stored locally """
+  global _tfds
+  if _tfds is None:
+    import tensorflow_datasets
+    _tfds = tensorflow_datasets
+  return _tfds
+
+
+_tfds_cache = {}
+
+
+def _load_tfds(name, split, **kwargs):
+  r""" `tfds.load` memoized on its arguments, `tf.data.Dataset` are immutable
+  so the loaded partitions are safely shared by all instances """
+  key = (name, tuple(split), tuple(sorted(kwargs.items())))
+  if key not in _tfds_cache:
+    _tfds_cache[key] = tuple(_get_tfds().load(name=name, split=split, **kwargs))
+  return _tfds_cache[key]
+
+
+_PARTITIONS = dict(train='train',
+                   training='train',
+                   valid='valid',
+                   validation='valid',
+                   test='test',
+                   testing='test',
+                   unlabeled='unlabeled')
+
+
 def _partition(part, train=None, valid=None, test=None, unlabeled=None):
   r""" A function for automatically select the right data partition """
   part = str(part).lower().strip()
-  if 'train' in part:
-    ret = train
-  elif 'valid' in part:
-    ret = valid
-  elif 'test' in part:
-    ret = test
-  elif 'unlabeled' in part:
-    ret = unlabeled
-  else:
+  name = _PARTITIONS.get(part, None)
+  if name is None:
     raise ValueError("No support for partition with name: '%s'" % part)
+  ret = dict(train=train, valid=valid, test=test, unlabeled=unlabeled)[name]
   if ret is None:
     raise ValueError("No data for parition with name: '%s'" % part)
   return ret
@@ -42,28 +70,35 @@ class ImageDataset:
     train = self.create_dataset(batch_size=n_samples,
                                 partition='train',
                                 inc_labels=False)
-    images = [x for x in train.take(10)]
-    rand = np.random.RandomState(seed=seed)
-    images = images[rand.choice(10)].numpy()
+    idx = int(np.random.RandomState(seed=seed).choice(10))
+    images = next(iter(train.skip(idx).take(1))).numpy()
     # plot and save the figure
     if save_path is not None:
+      # tile all images into a single (n * H, n * W, C) grid
       plot_images = images
-      if plot_images.shape[-1] == 1:
-        plot_images = np.squeeze(plot_images, axis=-1)
+      if plot_images.ndim == 3:
+        plot_images = np.expand_dims(plot_images, axis=-1)
+      _, h, w, c = plot_images.shape
+      grid = plot_images.reshape(n, n, h, w, c).transpose(0, 2, 1, 3, 4)
+      grid = grid.reshape(n * h, n * w, c)
+      if c == 1:
+        grid = np.squeeze(grid, axis=-1)
       from matplotlib import pyplot as plt
-      fig = plt.figure(figsize=(16, 16))
-      for i in range(n_samples):
-        plt.subplot(n, n, i + 1)
-        img = plot_images[i]
-        plt.imshow(img)
-        plt.axis('off')
-      plt.tight_layout()
+      fig, ax = plt.subplots(figsize=(16, 16))
+      ax.imshow(grid)
+      ax.axis('off')
+      fig.tight_layout()
       fig.savefig(save_path, dpi=int(dpi))
       plt.close(fig)
     return images
 
   def normalize_255(self, image):
-    return tf.clip_by_value(image / 255., 1e-6, 1. - 1e-6)
+    r""" Scale pixel values into `(0, 1)`, a single multiply followed by a
+    clip which XLA fuses into one elementwise kernel when auto-clustering is
+    enabled (i.e. `tf.config.optimizer.set_jit(True)`) """
+    if image.dtype.is_integer:
+      image = tf.cast(image, tf.float32)
+    return tf.clip_by_value(image * (1. / 255.), 1e-6, 1. - 1e-6)
 
   @property
   def n_labels(self):
@@ -87,7 +122,7 @@ class ImageDataset:
                      shuffle=1000,
                      prefetch=tf.data.experimental.AUTOTUNE,
                      cache='',
-                     parallel=None,
+                     parallel=tf.data.experimental.AUTOTUNE,
                      partition='train',
                      inc_labels=False,
                      seed=1) -> tf.data.Dataset:
@@ -101,8 +136,7 @@ class BinarizedMNIST(ImageDataset):
   r""" BinarizedMNIST """
 
   def __init__(self):
-    import tensorflow_datasets as tfds
-    self.train, self.valid, self.test = tfds.load(
+    self.train, self.valid, self.test = _load_tfds(
         name='binarized_mnist',
         split=['train', 'validation', 'test'],
         as_supervised=False)
@@ -121,10 +155,11 @@ class BinarizedMNIST(ImageDataset):
                      shuffle=1000,
                      prefetch=tf.data.experimental.AUTOTUNE,
                      cache='',
-                     parallel=None,
+                     parallel=tf.data.experimental.AUTOTUNE,
                      partition='train',
                      inc_labels=False,
-                     seed=1) -> tf.data.Dataset:
+                     seed=1,
+                     device=None) -> tf.data.Dataset:
     r"""
     Arguments:
       partition : {'train', 'valid', 'test'}
@@ -132,6 +167,10 @@ class BinarizedMNIST(ImageDataset):
         otherwise, only image is returned.
         If a scalar is provided, it indicate the percent of labelled data
         in the mask.
+      device : a String (e.g. '/gpu:0') or None. If given, the batches are
+        prefetched to the device memory, no transformation could be applied
+        to the returned dataset afterward (e.g. `repeat`), hence, off by
+        default.
 
     Return :
       tensorflow.data.Dataset :
@@ -147,48 +186,64 @@ class BinarizedMNIST(ImageDataset):
     struct = tf.data.experimental.get_structure(ds)
     if len(struct) == 1:
       inc_labels = False
-    ids = tf.range(self.n_labels, dtype=tf.float32)
     inc_labels = float(inc_labels)
-    gen = tf.random.experimental.Generator.from_seed(seed=seed)
 
     def _process_dict(data):
-      image = tf.cast(data['image'], tf.float32)
-      if not self.is_binary:
-        image = self.normalize_255(image)
-      if inc_labels:
-        label = tf.cast(data['label'], tf.float32)
-        if len(label.shape) == 0:  # covert to one-hot
-          label = tf.cast(ids == label, tf.float32)
-        if 0. < inc_labels < 1.:  # semi-supervised mask
-          mask = gen.uniform(shape=(1,)) < inc_labels
-          return dict(inputs=(image, label), mask=mask)
-        return image, label
-      return image
+      return _process_tuple(data['image'], data.get('label', None))
 
     def _process_tuple(*data):
-      image = tf.cast(data[0], tf.float32)
-      if not self.is_binary:
-        image = self.normalize_255(image)
+      image = data[0]
       if inc_labels:
-        label = tf.cast(data[1], tf.float32)
+        label = data[1]
         if len(label.shape) == 0:  # covert to one-hot
-          label = tf.cast(ids == label, tf.float32)
-        if 0. < inc_labels < 1.:  # semi-supervised mask
-          mask = gen.uniform(shape=(1,)) < inc_labels
-          return dict(inputs=(image, label), mask=mask)
+          label = tf.one_hot(tf.cast(label, tf.int32),
+                             depth=self.n_labels,
+                             dtype=tf.float32)
+        else:
+          label = tf.cast(label, tf.float32)
         return image, label
       return image
 
-    ds = ds.map(_process_dict if isinstance(struct, dict) else _process_tuple,
-                parallel)
+    def _process_semi(idx, data):  # semi-supervised mask
+      image, label = _process_dict(data) if isinstance(data, dict) else \
+        _process_tuple(*data)
+      # stateless draw keyed on (seed, example index), so the labelled subset
+      # is fixed for the whole training
+      mask = tf.random.stateless_uniform(
+          shape=(1,), seed=tf.stack([tf.constant(seed, dtype=tf.int64), idx]))
+      return image, label, mask < inc_labels
+
+    def _process_batch(image, *labels):  # cast and normalize the whole batch
+      image = tf.cast(image, tf.float32)
+      if not self.is_binary:
+        image = self.normalize_255(image)
+      if not inc_labels:
+        return image
+      if 0. < inc_labels < 1.:
+        label, mask = labels
+        return dict(inputs=(image, label), mask=mask)
+      return image, labels[0]
+
+    # deterministic pre-processing is cached, images are kept in their
+    # original dtype until batched
+    if 0. < inc_labels < 1.:
+      ds = ds.enumerate().map(_process_semi, num_parallel_calls=parallel)
+    else:
+      ds = ds.map(_process_dict if isinstance(struct, dict) else _process_tuple,
+                  num_parallel_calls=parallel)
     if cache is not None:
       ds = ds.cache(str(cache))
     # shuffle must be called after cache
     if shuffle is not None:
       ds = ds.shuffle(int(shuffle))
     ds = ds.batch(batch_size, drop_remainder)
+    ds = ds.map(_process_batch, num_parallel_calls=parallel)
     if prefetch is not None:
       ds = ds.prefetch(prefetch)
+    # copy the batches to the device memory ahead of time, this must be the
+    # last transformation of the pipeline
+    if device is not None:
+      ds = ds.apply(tf.data.experimental.prefetch_to_device(device))
     return ds
 
 
@@ -196,8 +251,7 @@ class MNIST(BinarizedMNIST):
   r""" MNIST """
 
   def __init__(self):
-    import tensorflow_datasets as tfds
-    self.train, self.valid, self.test = tfds.load(
+    self.train, self.valid, self.test = _load_tfds(
         name='mnist',
         split=['train[:90%]', 'train[90%:]', 'test'],
         shuffle_files=True,
@@ -221,8 +275,7 @@ class BinarizedAlphaDigits(BinarizedMNIST):
   39 examples of each class. """
 
   def __init__(self):
-    import tensorflow_datasets as tfds
-    self.train, self.valid, self.test = tfds.load(
+    self.train, self.valid, self.test = _load_tfds(
         name='binary_alpha_digits',
         split=['train[:70%]', 'train[70%:80%]', 'train[80%:]'],
         as_supervised=True,
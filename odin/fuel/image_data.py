@@ -15,7 +15,7 @@ from tqdm import tqdm
 
 from bigarray import MmapArray, MmapArrayWriter
 from odin.fuel._image_base import (MNIST, BinarizedAlphaDigits, BinarizedMNIST,
-                                   ImageDataset, _partition)
+                                   ImageDataset, _load_tfds, _partition)
 from odin.fuel._image_lego_faces import LegoFaces
 from odin.fuel._image_synthesize import YDisentanglement
 from odin.utils import as_tuple, batching, get_datasetpath, one_hot
@@ -431,8 +431,7 @@ class dSprites(ImageDataset):
 
   def __init__(self):
     super().__init__()
-    import tensorflow_datasets as tfds
-    self.train, self.valid, self.test = tfds.load(
+    self.train, self.valid, self.test = _load_tfds(
         "dsprites",
         split=["train[:85%]", "train[85%:90%]", "train[90%:]"],
         shuffle_files=True)
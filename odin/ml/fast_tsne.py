@@ -1,22 +1,118 @@
 from __future__ import absolute_import, division, print_function
 
+import os
+import threading
 import warnings
+import weakref
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 
 import numpy as np
 
-from odin.utils.crypto import md5_checksum
-from odin.utils.mpi import MPI, cpu_count
+from odin.utils.crypto import fast_content_hash
+from odin.utils.mpi import cpu_count
 
-_cached_values = {}
+
+class _LRUCache:
+  r""" A minimal least-recently-used mapping, the oldest entry is evicted
+  once `maxsize` is reached """
+
+  def __init__(self, maxsize):
+    self.maxsize = max(int(maxsize), 0)
+    self._data = OrderedDict()
+
+  def __contains__(self, key):
+    return key in self._data
+
+  def __len__(self):
+    return len(self._data)
+
+  def __getitem__(self, key):
+    self._data.move_to_end(key)
+    return self._data[key]
+
+  def __setitem__(self, key, value):
+    self._data[key] = value
+    self._data.move_to_end(key)
+    while len(self._data) > self.maxsize:
+      self._data.popitem(last=False)
+
+  def clear(self):
+    self._data.clear()
+
+
+_cached_values = _LRUCache(maxsize=os.environ.get('ODIN_TSNE_CACHE', 32))
+_hash_memo = {}
+_tsne_classes = {}
+_tsne_lock = threading.Lock()
 
 
 # ===========================================================================
 # auto-select best TSNE
 # ===========================================================================
-def _create_key(framework, kwargs, md5):
+def _hash(x):
+  r""" Content hash of an array memoized on the identity of the array, the
+  entry is dropped once the array is garbage collected.
+
+  Note: in-place modification of the array's values is not detected.
+  """
+  key = (x.shape, x.strides, x.dtype.str, x.nbytes)
+  memo = _hash_memo.get(id(x), None)
+  if memo is not None and memo[0] == key:
+    return memo[1]
+  digest = fast_content_hash(x)
+  if memo is None:
+    weakref.finalize(x, _hash_memo.pop, id(x), None)
+  _hash_memo[id(x)] = (key, digest)
+  return digest
+
+
+def _hash_all(X):
+  r""" Hash a list of arrays concurrently, the hashers release the GIL """
+  if len(X) == 1:
+    return [_hash(X[0])]
+  with ThreadPoolExecutor(max_workers=min(len(X), cpu_count())) as executor:
+    return list(executor.map(_hash, X))
+
+
+def _resolve_tsne(force_sklearn=False):
+  r""" Return the best available TSNE class and its version, the imports are
+  only attempted once per process """
+  force_sklearn = bool(force_sklearn)
+  if force_sklearn in _tsne_classes:
+    return _tsne_classes[force_sklearn]
+  with _tsne_lock:
+    if force_sklearn in _tsne_classes:
+      return _tsne_classes[force_sklearn]
+    tsne_version = None
+    if not force_sklearn:
+      try:
+        from cuml.manifold import TSNE
+        tsne_version = 'cuda'
+      except ImportError:
+        warnings.warn(
+            "Install GPUs-accelerated t-SNE from `https://github.com/rapidsai/cuml` "
+            "using `conda install -c rapidsai -c nvidia -c conda-forge -c defaults cuml=0.10 python=3.6 cudatoolkit=10.0`"
+        )
+        try:
+          from MulticoreTSNE import MulticoreTSNE as TSNE
+          tsne_version = 'multicore'
+        except ImportError:
+          warnings.warn(
+              "Install MulticoreTSNE from "
+              "pip install git+https://github.com/DmitryUlyanov/Multicore-TSNE.git"
+              " to accelerate the T-SNE on multiple CPU cores.")
+    if tsne_version is None:
+      from sklearn.manifold import TSNE
+      tsne_version = 'sklearn'
+    _tsne_classes[force_sklearn] = (TSNE, tsne_version)
+  return TSNE, tsne_version
+
+
+def _create_key(framework, kwargs, digest):
   key = dict(kwargs)
   del key['verbose']
-  key['md5'] = md5
+  key['digest'] = digest
   return framework + str(list(sorted(key.items(), key=lambda x: x[0])))
 
 
@@ -101,6 +197,8 @@ def fast_tsne(*X,
         If None, the random number generator is the RandomState instance used
         by `np.random`.  Note that different initializations might result in
         different local minima of the cost function.
+        The same seed is used for downsampling given `n_samples`, an int or
+        None seed creates a `np.random.default_rng` for it.
     method : string (default: 'barnes_hut')
         By default the gradient calculation algorithm uses Barnes-Hut
         approximation running in O(NlogN) time. method='exact'
@@ -126,6 +224,12 @@ def fast_tsne(*X,
     X = X[0]
   if not all(isinstance(x, np.ndarray) for x in X):
     raise ValueError("`X` can only be list of numpy.ndarray or numpy.ndarray")
+  # TSNE implementations only accept int, RandomState or None, it is also
+  # a part of the cache key
+  if not (random_state is None or
+          isinstance(random_state, (int, np.integer, np.random.RandomState))):
+    raise ValueError("`random_state` must be an int, numpy.random.RandomState "
+                     "or None, but given: %s" % str(type(random_state)))
   # ====== kwarg for creating T-SNE class ====== #
   kwargs = dict(locals())
   del kwargs['X']
@@ -138,36 +242,16 @@ def fast_tsne(*X,
     n_samples = int(n_samples)
     assert n_samples > 0
     new_X = []
-    rand = random_state if isinstance(random_state, np.random.RandomState) else \
-    np.random.RandomState(seed=random_state)
+    rand = random_state if isinstance(random_state, np.random.RandomState) \
+      else np.random.default_rng(random_state)
     for x in X:
       if x.shape[0] > n_samples:
-        ids = rand.permutation(x.shape[0])[:n_samples]
-        x = x[ids]
+        ids = rand.choice(x.shape[0], size=n_samples, replace=False)
+        x = np.take(x, ids, axis=0)
       new_X.append(x)
     X = new_X
   # ====== import proper T-SNE ====== #
-  tsne_version = None
-  if not force_sklearn:
-    try:
-      from cuml.manifold import TSNE
-      tsne_version = 'cuda'
-    except ImportError:
-      warnings.warn(
-          "Install GPUs-accelerated t-SNE from `https://github.com/rapidsai/cuml` "
-          "using `conda install -c rapidsai -c nvidia -c conda-forge -c defaults cuml=0.10 python=3.6 cudatoolkit=10.0`"
-      )
-      try:
-        from MulticoreTSNE import MulticoreTSNE as TSNE
-        tsne_version = 'multicore'
-      except ImportError:
-        warnings.warn(
-            "Install MulticoreTSNE from "
-            "pip install git+https://github.com/DmitryUlyanov/Multicore-TSNE.git"
-            " to accelerate the T-SNE on multiple CPU cores.")
-  if tsne_version is None:
-    from sklearn.manifold import TSNE
-    tsne_version = 'sklearn'
+  TSNE, tsne_version = _resolve_tsne(force_sklearn)
   # ====== modify kwargs ====== #
   if tsne_version == 'cuda':
     del kwargs['n_jobs']
@@ -181,44 +265,45 @@ def fast_tsne(*X,
   X_size = []
   if combined:
     X_size = [x.shape[0] for x in X]
-    x = np.vstack(X) if len(X) > 1 else X[0]
-    md5 = md5_checksum(x)
-    key = _create_key(tsne_version, kwargs, md5)
+    # combine the per-array hashes, only stack the arrays on a cache miss
+    digest = '.'.join(_hash_all(X))
+    key = _create_key(tsne_version, kwargs, digest)
     if key in _cached_values:
       results.append((0, _cached_values[key]))
     else:
-      X_new.append((0, md5, x))
+      x = np.vstack(X) if len(X) > 1 else X[0]
+      X_new.append((0, digest, x))
   else:
-    for i, x in enumerate(X):
-      md5 = md5_checksum(x)
-      key = _create_key(tsne_version, kwargs, md5)
+    for i, (x, digest) in enumerate(zip(X, _hash_all(X))):
+      key = _create_key(tsne_version, kwargs, digest)
       if key in _cached_values:
         results.append((i, _cached_values[key]))
       else:
-        X_new.append((i, md5, x))
+        X_new.append((i, digest, x))
 
   # ====== perform T-SNE ====== #
   def apply_tsne(j):
-    idx, md5, x = j
+    idx, digest, x = j
     tsne = TSNE(**kwargs)
-    return (idx, md5, tsne.fit_transform(x), tsne if return_model else None)
+    return (idx, digest, tsne.fit_transform(x), tsne if return_model else None)
 
-  # only 1 X, no need for MPI
+  # only 1 X, no need for parallel execution
   if len(X_new) == 1 or tsne_version in ('cuda', 'multicore'):
     for x in X_new:
-      idx, md5, x, model = apply_tsne(x)
+      idx, digest, x, model = apply_tsne(x)
       results.append((idx, x))
-      _cached_values[_create_key(tsne_version, kwargs, md5)] = x
+      _cached_values[_create_key(tsne_version, kwargs, digest)] = x
   else:
-    mpi = MPI(jobs=X_new,
-              func=apply_tsne,
-              batch=1,
-              ncpu=min(len(X_new),
-                       cpu_count() - 1))
+    # sklearn's t-SNE spends most of its time in BLAS/Cython without the
+    # GIL, threads avoid pickling the arrays to worker processes
     model = []
-    for idx, md5, x, m in mpi:
+    with ThreadPoolExecutor(
+        max_workers=max(1, min(len(X_new),
+                               cpu_count() - 1))) as executor:
+      outputs = list(executor.map(apply_tsne, X_new))
+    for idx, digest, x, m in outputs:
       results.append((idx, x))
-      _cached_values[_create_key(tsne_version, kwargs, md5)] = x
+      _cached_values[_create_key(tsne_version, kwargs, digest)] = x
       model.append(m)
   # ====== return and clean ====== #
   if combined and len(X_size) > 1:
@@ -6,6 +6,7 @@ import os
 import pickle
 import struct
 import zipfile
+from functools import lru_cache
 from io import BytesIO
 from numbers import Number
 
@@ -55,6 +56,16 @@ def _data_to_iobuffer(file_or_data):
 # ===========================================================================
 # Hashing
 # ===========================================================================
+_ARRAY_CHUNKSIZE = 4 << 20
+
+
+def _iter_array_chunks(arr, chunksize=_ARRAY_CHUNKSIZE):
+  r""" Zero-copy iteration over the raw bytes of a contiguous array """
+  mv = memoryview(arr.reshape(-1).view(np.uint8))
+  for start in range(0, len(mv), chunksize):
+    yield mv[start:start + chunksize]
+
+
 def _is_dictionary(obj):
   return isinstance(obj, dict) or \
     'omegaconf.dictconfig.DictConfig' in str(type(obj))
@@ -145,15 +156,18 @@ def md5_checksum(file_or_path,
    all(isinstance(i, np.ndarray) for i in file_or_path)):
     if not isinstance(file_or_path, (tuple, list)):
       file_or_path = (file_or_path,)
-    # copy data
-    f = BytesIO()
+    # hash the same byte stream as `np.save`, but feed the array buffer
+    # directly instead of serializing a copy of it
     for arr in file_or_path:
-      np.save(file=f, arr=arr, allow_pickle=False)
-    f.seek(0)
-    # update hash
-    for chunk in iter(lambda: f.read(chunksize), b""):
-      hash_md5.update(chunk)
-    f.close()
+      if arr.dtype.hasobject:
+        raise ValueError("MD5 checksum has NO support for object array")
+      header = np.lib.format.header_data_from_array_1_0(arr)
+      f = BytesIO()
+      np.lib.format.write_array_header_1_0(f, header)
+      hash_md5.update(f.getvalue())
+      arr = arr.T if header['fortran_order'] else np.ascontiguousarray(arr)
+      for chunk in _iter_array_chunks(arr, chunksize):
+        hash_md5.update(chunk)
   # ======  path to file or folder ====== #
   elif isinstance(file_or_path, string_types):
     # TODO: sometimes the folder or file "accidently" exists
@@ -199,6 +213,38 @@ def md5_checksum(file_or_path,
   return digest
 
 
+@lru_cache(maxsize=1)
+def _fast_hasher():
+  try:
+    import xxhash
+    return xxhash.xxh3_128
+  except (ImportError, AttributeError):
+    pass
+  try:
+    import blake3
+    return blake3.blake3
+  except ImportError:
+    pass
+  return lambda: hashlib.blake2b(digest_size=16)
+
+
+def fast_content_hash(x) -> str:
+  r""" A fast non-cryptographic hash of the content of a numpy array, meant
+  for cache keys only (use `md5_checksum` when the checksum is stored or
+  compared against external values).
+
+  The first available hasher among `xxhash.xxh3_128`, `blake3` and
+  `hashlib.blake2b` is used, hence the digest is only stable within the same
+  environment. The shape and dtype of the array are included in the hash.
+  """
+  x = np.ascontiguousarray(x)
+  h = _fast_hasher()()
+  h.update(str((x.shape, x.dtype.str)).encode('utf-8'))
+  for chunk in _iter_array_chunks(x):
+    h.update(chunk)
+  return h.hexdigest()
+
+
 # ===========================================================================
 # Encryption
 # ===========================================================================
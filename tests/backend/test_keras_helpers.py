@@ -0,0 +1,58 @@
+from __future__ import absolute_import, division, print_function
+
+import unittest
+
+import numpy as np
+import tensorflow as tf
+from tensorflow.python import keras
+
+from odin.backend.keras_helpers import fold_batchnorm
+
+np.random.seed(8)
+tf.random.set_seed(8)
+
+
+def _conv_bn_model(**kwargs):
+  return keras.Sequential([
+      keras.layers.Conv2D(8, 3, padding='same', use_bias=False, **kwargs),
+      keras.layers.BatchNormalization(),
+      keras.layers.Activation('relu'),
+      keras.layers.Flatten(),
+      keras.layers.Dense(16),
+      keras.layers.BatchNormalization(),
+  ])
+
+
+class KerasHelpersTest(unittest.TestCase):
+
+  def _test_fold_batchnorm(self, model):
+    x = np.random.rand(4, 6, 6, 3).astype('float32')
+    model(x, training=False)
+    # make the moving statistics non-trivial
+    for layer in model.layers:
+      if isinstance(layer, keras.layers.BatchNormalization):
+        layer.set_weights([
+            np.random.rand(*w.shape).astype('float32') + 0.5
+            for w in layer.get_weights()
+        ])
+    folded = fold_batchnorm(model)
+    self.assertEqual(len(folded.layers), 4)
+    self.assertFalse(
+        any(
+            isinstance(layer, keras.layers.BatchNormalization)
+            for layer in folded.layers))
+    self.assertTrue(
+        np.allclose(model(x, training=False).numpy(),
+                    folded(x, training=False).numpy(),
+                    atol=1e-5))
+
+  def test_fold_batchnorm(self):
+    # layers are only called eagerly, no input_shape or output_shape
+    self._test_fold_batchnorm(_conv_bn_model())
+
+  def test_fold_batchnorm_input_shape(self):
+    self._test_fold_batchnorm(_conv_bn_model(input_shape=(6, 6, 3)))
+
+
+if __name__ == '__main__':
+  unittest.main()
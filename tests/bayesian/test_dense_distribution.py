@@ -0,0 +1,49 @@
+from __future__ import absolute_import, division, print_function
+
+import unittest
+
+import numpy as np
+import tensorflow as tf
+
+from odin.bay.layers import DenseDistribution, VectorDeterministicLayer
+
+np.random.seed(8)
+tf.random.set_seed(8)
+
+
+class _ScaledDeterministicLayer(VectorDeterministicLayer):
+
+  @staticmethod
+  def new(params, event_shape=(), log_prob=None, validate_args=False,
+          name='ScaledDeterministicLayer'):
+    return VectorDeterministicLayer.new(params * 2.,
+                                        event_shape=event_shape,
+                                        log_prob=log_prob,
+                                        validate_args=validate_args,
+                                        name=name)
+
+
+class DenseDistributionTest(unittest.TestCase):
+
+  def test_dropout_relaxed_batch_shape(self):
+    layer = DenseDistribution(event_shape=(4,),
+                              posterior='normal',
+                              dropout=0.3)
+    # different batch sizes retrace the compiled params with None dimensions
+    for batch_size in (8, 5):
+      x = np.random.rand(batch_size, 3, 6).astype('float32')
+      qZ = layer(x, training=True)
+      self.assertEqual(tuple(qZ.mean().shape), (batch_size, 3, 4))
+
+  def test_deterministic_subclass(self):
+    layer = DenseDistribution(event_shape=(4,),
+                              posterior=_ScaledDeterministicLayer,
+                              disable_projection=True)
+    x = np.random.rand(8, 4).astype('float32')
+    qZ = layer(x)
+    # the subclass's own `new` must be used
+    self.assertTrue(np.allclose(qZ.mean().numpy(), x * 2.))
+
+
+if __name__ == '__main__':
+  unittest.main()
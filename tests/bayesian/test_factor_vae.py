@@ -0,0 +1,49 @@
+from __future__ import absolute_import, division, print_function
+
+import os
+import unittest
+
+import numpy as np
+import tensorflow as tf
+
+from odin.bay.vi import autoencoder
+
+os.environ['TF_CPP_MIN_LOG_LEVEL'] = '3'
+os.environ['TF_FORCE_GPU_ALLOW_GROWTH'] = 'true'
+
+np.random.seed(8)
+tf.random.set_seed(8)
+
+
+class FactorVAETest(unittest.TestCase):
+
+  def test_fit_strategy(self):
+    strategy = tf.distribute.MirroredStrategy(devices=['/cpu:0'])
+    with strategy.scope():
+      vae = autoencoder.FactorVAE(
+          latents=autoencoder.RandomVariable(4, posterior='diag',
+                                             name='Latent'),
+          discriminator=dict(units=8, n_hidden_layers=1))
+      optimizer = [tf.optimizers.Adam(1e-3), tf.optimizers.Adam(1e-3)]
+    x = np.random.rand(32, 64).astype('float32')
+    ds = tf.data.Dataset.from_tensor_slices(x).batch(8)
+    vae_params = [v.numpy() for v in vae.vae_params]
+    disc_params = [v.numpy() for v in vae.disc_params]
+    vae.fit(ds,
+            valid=ds,
+            valid_freq=1,
+            optimizer=optimizer,
+            epochs=1,
+            max_iter=2,
+            compile_graph=False,
+            strategy=strategy)
+    self.assertTrue(
+        any(np.any(v0 != v.numpy()) for v0, v in zip(vae_params,
+                                                      vae.vae_params)))
+    self.assertTrue(
+        any(np.any(v0 != v.numpy()) for v0, v in zip(disc_params,
+                                                      vae.disc_params)))
+
+
+if __name__ == '__main__':
+  unittest.main()
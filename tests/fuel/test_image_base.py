@@ -0,0 +1,27 @@
+from __future__ import absolute_import, division, print_function
+
+import unittest
+
+from odin.fuel._image_base import _partition
+
+
+class ImageBaseTest(unittest.TestCase):
+
+  def test_partition(self):
+    kw = dict(train=1, valid=2, test=3)
+    self.assertEqual(_partition('train', **kw), 1)
+    self.assertEqual(_partition(' Training ', **kw), 1)
+    self.assertEqual(_partition('valid', **kw), 2)
+    self.assertEqual(_partition('VALIDATION', **kw), 2)
+    self.assertEqual(_partition('testing', **kw), 3)
+    # substrings of a partition name are not matched anymore
+    for part in ('invalid', 'pretrain_test', 'trainvalid', ''):
+      with self.assertRaises(ValueError):
+        _partition(part, **kw)
+    # known partition without data
+    with self.assertRaises(ValueError):
+      _partition('unlabeled', **kw)
+
+
+if __name__ == '__main__':
+  unittest.main()
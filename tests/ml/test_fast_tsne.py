@@ -0,0 +1,40 @@
+from __future__ import absolute_import, division, print_function
+
+import unittest
+
+import numpy as np
+
+from odin.ml.fast_tsne import _LRUCache, fast_tsne
+
+
+class FastTsneTest(unittest.TestCase):
+
+  def test_lru_cache(self):
+    cache = _LRUCache(maxsize=2)
+    cache['a'] = 1
+    cache['b'] = 2
+    # reading 'a' makes 'b' the least recently used entry
+    self.assertEqual(cache['a'], 1)
+    cache['c'] = 3
+    self.assertEqual(len(cache), 2)
+    self.assertIn('a', cache)
+    self.assertIn('c', cache)
+    self.assertNotIn('b', cache)
+    # overwriting an entry refreshes it
+    cache['a'] = 4
+    cache['d'] = 5
+    self.assertNotIn('c', cache)
+    self.assertEqual(cache['a'], 4)
+    # zero size never keeps anything
+    cache = _LRUCache(maxsize=0)
+    cache['a'] = 1
+    self.assertEqual(len(cache), 0)
+
+  def test_random_state_generator(self):
+    x = np.random.rand(20, 4).astype('float32')
+    with self.assertRaises(ValueError):
+      fast_tsne(x, n_samples=10, random_state=np.random.default_rng(1))
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,58 @@
+from __future__ import absolute_import, division, print_function
+
+import hashlib
+import unittest
+from io import BytesIO
+
+import numpy as np
+
+from odin.utils.crypto import fast_content_hash, md5_checksum
+
+np.random.seed(8)
+
+
+def _md5_npsave(*arrays):
+  f = BytesIO()
+  for arr in arrays:
+    np.save(file=f, arr=arr, allow_pickle=False)
+  return hashlib.md5(f.getvalue()).hexdigest()
+
+
+class CryptoTest(unittest.TestCase):
+
+  def test_md5_checksum_array(self):
+    x = np.random.rand(12, 8).astype('float32')
+    arrays = [
+        x,
+        np.asfortranarray(x),
+        x[::2, 1::3],
+        np.array(3.14),
+        np.empty((0, 5), dtype='int16'),
+        np.zeros(4, dtype=[('a', 'i4'), ('b', 'f8')]),
+        x > 0.5,
+    ]
+    # the digests must match the previous `np.save` serialization
+    for arr in arrays:
+      self.assertEqual(md5_checksum(arr), _md5_npsave(arr))
+    self.assertEqual(md5_checksum(arrays[:3]), _md5_npsave(*arrays[:3]))
+    # small chunks
+    self.assertEqual(md5_checksum(x, chunksize=7), _md5_npsave(x))
+
+  def test_fast_content_hash(self):
+    x = np.random.rand(12, 8).astype('float32')
+    h = fast_content_hash(x)
+    self.assertEqual(h, fast_content_hash(x.copy()))
+    # memory layout doesn't matter, only the content
+    self.assertEqual(h, fast_content_hash(np.asfortranarray(x)))
+    self.assertEqual(fast_content_hash(x[::2]),
+                     fast_content_hash(np.ascontiguousarray(x[::2])))
+    y = x.copy()
+    y[3, 4] += 1.
+    self.assertNotEqual(h, fast_content_hash(y))
+    # same bytes but different shape or dtype
+    self.assertNotEqual(h, fast_content_hash(x.reshape(8, 12)))
+    self.assertNotEqual(h, fast_content_hash(x.view('int32')))
+
+
+if __name__ == '__main__':
+  unittest.main()